@@ -1,21 +1,40 @@
 # app.py
 import argparse
 import sys
-import cadquery as cq
-from exporter.exporter import export_shape
-from models.frame_model import make_frame
-from models.bone_model import make_bone
-from models.assembly import make_assembly
+import threading
+
+
+def _warmup(ready: threading.Event) -> None:
+    """
+    Import CadQuery (and its OCP bindings) plus the model modules, then set 'ready'.
+
+    The event is set even if an import fails, so waiting builds re-raise the
+    actual ImportError instead of blocking forever.
+    """
+    try:
+        import cadquery  # noqa: F401
+        import models.frame_model  # noqa: F401
+        import models.bone_model  # noqa: F401
+        import models.assembly  # noqa: F401
+        import exporter.exporter  # noqa: F401
+    finally:
+        ready.set()
 
 
 def run_gui():
     """
     Launch the PyQt-based GUI for interactive parameter editing and preview.
+
+    The heavy CadQuery import runs on a background thread while Qt and the
+    window start up; preview builds wait for it to finish.
     """
+    ready = threading.Event()
+    threading.Thread(target=_warmup, args=(ready,), daemon=True).start()
+
     from PyQt6 import QtWidgets
     from ui.main_window import MainWindow
     app = QtWidgets.QApplication(sys.argv)
-    w = MainWindow()
+    w = MainWindow(models_ready=ready)
     w.show()
     sys.exit(app.exec())
 
@@ -74,6 +93,11 @@ def main():
     if not args.nogui:
         return run_gui()
 
+    from exporter.exporter import export_shape
+    from models.frame_model import make_frame
+    from models.bone_model import make_bone
+    from models.assembly import make_assembly, combine_placements
+
     # === Build model ===
     if args.component == 'frame':
         model = make_frame(args.a, args.c, args.d, args.n)
@@ -85,20 +109,7 @@ def main():
     # === Export ===
     if isinstance(model, list):
         # Assembly: combine into a single compound for export
-        moved_vals = []
-        for shp, (dx, dy, dz), (rz, ry, rx) in model:
-            wp = shp
-            if rz:
-                wp = wp.rotate((0, 0, 0), (0, 0, 1), rz)
-            if ry:
-                wp = wp.rotate((0, 0, 0), (0, 1, 0), ry)
-            if rx:
-                wp = wp.rotate((0, 0, 0), (1, 0, 0), rx)
-            wp = wp.translate((dx, dy, dz))
-            moved_vals.append(wp.val())
-        comp = cq.Compound.makeCompound(moved_vals)
-        wp_comp = cq.Workplane(obj=comp)
-        path = export_shape(wp_comp, args.out, args.fmt)
+        path = export_shape(combine_placements(model), args.out, args.fmt)
     else:
         path = export_shape(model, args.out, args.fmt)
 
@@ -1,12 +1,19 @@
 # exporter/exporter.py
 import cadquery as cq
 from pathlib import Path
+from OCP.IFSelect import IFSelect_RetDone
+from OCP.STEPControl import STEPControl_Writer, STEPControl_AsIs
+from models.locking import MESH_LOCK
 
 
 def export_shape(shape: cq.Workplane, out_path: str, fmt: str = "stl") -> str:
     """
     Export a CadQuery Workplane to either STL or STEP format.
 
+    The shape is handed straight to the OCCT writers, which stream to disk,
+    instead of going through cq.exporters.export. STL export holds MESH_LOCK
+    because it re-meshes solids that the preview may share; STEP does not.
+
     Args:
         shape: CadQuery Workplane object to export.
         out_path: Destination file path as string.
@@ -17,16 +24,28 @@ def export_shape(shape: cq.Workplane, out_path: str, fmt: str = "stl") -> str:
 
     Raises:
         ValueError: If an unsupported export format is specified.
+        RuntimeError: If the OCCT writer fails to write the file.
     """
     fmt = fmt.lower()
     out = Path(out_path)
     out.parent.mkdir(parents=True, exist_ok=True)
+    # Export every object on the stack, like cq.exporters.export (toCompound) did
+    vals = shape.vals()
+    val = vals[0] if len(vals) == 1 else cq.Compound.makeCompound(vals)
+
+    if fmt not in ("stl", "step", "stp"):
+        raise ValueError(f"Unsupported format: {fmt}")
 
     if fmt == "stl":
-        cq.exporters.export(shape, str(out), exportType="STL")
-    elif fmt in ("step", "stp"):
-        cq.exporters.export(shape, str(out), exportType="STEP")
+        # exportStl re-meshes the shape; hold the lock like preview tessellation
+        with MESH_LOCK:
+            ok = val.exportStl(str(out), tolerance=0.1, angularTolerance=0.1)
     else:
-        raise ValueError(f"Unsupported format: {fmt}")
+        # The STEP writer never triangulates, so it does not need MESH_LOCK
+        writer = STEPControl_Writer()
+        writer.Transfer(val.wrapped, STEPControl_AsIs)
+        ok = writer.Write(str(out)) == IFSelect_RetDone
+    if not ok:
+        raise RuntimeError(f"{'STL' if fmt == 'stl' else 'STEP'} export failed: {out}")
 
     return str(out.resolve())
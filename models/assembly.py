@@ -1,30 +1,122 @@
 # models/assembly.py
 
+import math
+from functools import lru_cache
+
 import cadquery as cq
-from models.frame_model import make_frame, PLATE_T
+import numpy as np
+from OCP.gp import gp_Ax1, gp_Dir, gp_Pnt, gp_Trsf, gp_Vec
+from OCP.TopLoc import TopLoc_Location
+from models.frame_model import make_frame, outer_size, PLATE_T
 from models.bone_model import make_bone, DEFAULTS as BONE_DEFAULTS
 
 BONE_X_INSET = 11.0  # inset bones by 11 mm toward the center along X
 
+
+def placement_matrix(offset, angles) -> np.ndarray:
+    """4x4 homogeneous matrix of an assembly placement.
+
+    Matches how placements are applied everywhere else: rotate about Z, then Y,
+    then X (degrees, about the origin), then translate by the offset.
+
+    Args:
+        offset: (dx, dy, dz) translation in mm.
+        angles: (rz, ry, rx) rotation angles in degrees.
+
+    Returns:
+        4x4 float array M with p' = M[:3, :3] @ p + M[:3, 3].
+    """
+    rz, ry, rx = np.radians(angles)
+    cz, sz = np.cos(rz), np.sin(rz)
+    cy, sy = np.cos(ry), np.sin(ry)
+    cx, sx = np.cos(rx), np.sin(rx)
+    Rz = np.array([[cz, -sz, 0.0], [sz, cz, 0.0], [0.0, 0.0, 1.0]])
+    Ry = np.array([[cy, 0.0, sy], [0.0, 1.0, 0.0], [-sy, 0.0, cy]])
+    Rx = np.array([[1.0, 0.0, 0.0], [0.0, cx, -sx], [0.0, sx, cx]])
+    M = np.eye(4)
+    M[:3, :3] = Rx @ Ry @ Rz
+    M[:3, 3] = offset
+    return M
+
+
+def placement_location(offset, angles) -> cq.Location:
+    """cq.Location of an assembly placement (same convention as placement_matrix).
+
+    The translation and the three rotations are composed into one gp_Trsf up
+    front, so applying a placement is a single location stamp.
+
+    Args:
+        offset: (dx, dy, dz) translation in mm.
+        angles: (rz, ry, rx) rotation angles in degrees.
+    """
+    (dx, dy, dz), (rz, ry, rx) = offset, angles
+    total = gp_Trsf()
+    total.SetTranslation(gp_Vec(dx, dy, dz))
+    # total = T * Rx * Ry * Rz, i.e. rotate about Z first and translate last
+    for axis, angle in (((1, 0, 0), rx), ((0, 1, 0), ry), ((0, 0, 1), rz)):
+        if angle:
+            rot = gp_Trsf()
+            rot.SetRotation(gp_Ax1(gp_Pnt(0, 0, 0), gp_Dir(*axis)), math.radians(angle))
+            total = total.Multiplied(rot)
+    return cq.Location(TopLoc_Location(total))
+
+
+def combine_placements(placements) -> cq.Workplane:
+    """Combine an assembly list into a single compound Workplane.
+
+    Each part is placed via Shape.moved(location), which only stamps a
+    TopLoc_Location onto the shape instead of copying its BRep, so the four
+    bones all reference the same underlying solid.
+
+    Args:
+        placements: list of (workplane, (dx, dy, dz), (rz, ry, rx)) as
+            returned by make_assembly(...); rotations in degrees.
+
+    Returns:
+        cq.Workplane wrapping the compound of all placed parts.
+    """
+    moved_vals = [
+        shp.val().moved(placement_location(offset, angles))
+        for shp, offset, angles in placements
+    ]
+    return cq.Workplane(obj=cq.Compound.makeCompound(moved_vals))
+
 def make_assembly(a: float, c: float, d: float, n: int, b: float):
     """Build the full assembly:
     - Frame 1 bottom: underside at Z = 0 (its center ends up at +PLATE_T/2).
     - Frame 2 top: mirrored in Z and translated so its top face lies at Z = b.
     - 4 upright bones at the four XY corners of Frame 1; each bone is inset by BONE_X_INSET along X.
       For the two lower corners (negative Y) shift the bones by +bone_thickness along Y so they fit inside.
+
+    Both frames are the memoized solids themselves (the top one via
+    _mirrored_frame), positioned purely by their placement offsets, so changing
+    only 'b' rebuilds just the bone and moves the top frame. The placements
+    themselves are cached as well; callers get a fresh list but the contained
+    Workplanes are shared.
     """
-    # Base frames
-    frame_raw = make_frame(a, c, d, n)  # centered around origin, thickness ±PLATE_T/2
-    frame1 = frame_raw.translate((0, 0, PLATE_T/2))  # bottom frame: underside at Z=0
-    frame2 = frame_raw.mirror(mirrorPlane="XY").translate((0, 0, b - PLATE_T/2))  # top frame: top at Z=b
+    return list(_build_assembly(a, c, d, n, b))
+
+
+@lru_cache(maxsize=32)
+def _mirrored_frame(a: float, c: float, d: float, n: int) -> cq.Workplane:
+    """make_frame(...) mirrored in XY (still centered on Z = 0), for the top frame."""
+    # Re-wrapped so the cached Workplane does not pin its parent chain
+    return cq.Workplane(obj=make_frame(a, c, d, n).mirror(mirrorPlane="XY").val())
+
+
+@lru_cache(maxsize=32)
+def _build_assembly(a: float, c: float, d: float, n: int, b: float) -> tuple:
+    """Cached worker behind make_assembly(); returns the placements as a tuple."""
+    # Base frames, both centered around origin with thickness ±PLATE_T/2;
+    # their Z position comes from the placement offsets below
+    frame1 = make_frame(a, c, d, n)
+    frame2 = _mirrored_frame(a, c, d, n)
 
-    # Outer dimensions from frame1 bounding box
-    f_bb = cq.Compound.makeCompound([frame1.val()]).BoundingBox()
-    outer_x = f_bb.xlen
-    outer_y = f_bb.ylen
+    # Outer dimensions of frame1, known analytically from the parameters
+    outer_x, outer_y = outer_size(a, c, d, n)
 
     # Bones stand upright: rotate bone around X so its original Y-length becomes Z-length
-    bone_raw = make_bone(b=b).rotate((0, 0, 0), (1, 0, 0), 90)
+    bone_raw = cq.Workplane(obj=make_bone(b=b).rotate((0, 0, 0), (1, 0, 0), 90).val())
     zc = b / 2.0  # bone center at mid-height so it spans Z=0..b
 
     # Four XY corners of the bottom frame
@@ -39,12 +131,12 @@ def make_assembly(a: float, c: float, d: float, n: int, b: float):
     bone_thickness = float(BONE_DEFAULTS.get("thickness", 5.0))
 
     placements = []
-    placements.append((frame1, (0.0, 0.0, 0.0), (0, 0, 0)))
-    placements.append((frame2, (0.0, 0.0, 0.0), (0, 0, 0)))
+    placements.append((frame1, (0.0, 0.0, PLATE_T/2), (0, 0, 0)))      # bottom frame: underside at Z=0
+    placements.append((frame2, (0.0, 0.0, b - PLATE_T/2), (0, 0, 0)))  # top frame: top at Z=b
 
     for (x, y) in corners:
         x_in = x - BONE_X_INSET if x > 0 else x + BONE_X_INSET
         y_in = y + bone_thickness if y < 0 else y
         placements.append((bone_raw, (x_in, y_in, zc), (0, 0, 0)))
 
-    return placements
+    return tuple(placements)
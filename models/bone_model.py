@@ -1,6 +1,8 @@
 # models/bone_model.py
+from functools import lru_cache
+
 import cadquery as cq
-from cadquery import selectors as s
+from models.selectors import NearestAnyOfSelector
 
 # ===== Default parameters =====
 # 'b' is the total tip-to-tip length, including both dovetails.
@@ -31,16 +33,33 @@ def make_bone(**params) -> cq.Workplane:
 
     Returns:
         CadQuery Workplane containing the final solid.
+
+    Note:
+        Results are memoized on the resolved parameter values, so the returned
+        Workplane is shared between callers and must not be mutated.
     """
     p = {**DEFAULTS, **params}
-    b = float(p["b"])
-    THICKNESS = float(p["thickness"])
+    return _build_bone(
+        float(p["b"]),
+        float(p["thickness"]),
+        float(p["x_out"]),
+        float(p["x_mid"]),
+        float(p["x_in"]),
+        float(p["l_dovetail"]),
+        float(p["edge_ch"]),
+    )
+
 
-    X_OUT = float(p["x_out"])
-    X_MID = float(p["x_mid"])
-    X_IN = float(p["x_in"])
-    L_DOVETAIL = float(p["l_dovetail"])
-    EDGE_CH = float(p["edge_ch"])
+@lru_cache(maxsize=32)
+def _build_bone(b: float, thickness: float, x_out: float, x_mid: float,
+                x_in: float, l_dovetail: float, edge_ch: float) -> cq.Workplane:
+    """Cached worker behind make_bone(); takes the resolved parameters positionally."""
+    THICKNESS = thickness
+    X_OUT = x_out
+    X_MID = x_mid
+    X_IN = x_in
+    L_DOVETAIL = l_dovetail
+    EDGE_CH = edge_ch
 
     # 'b' is the total length -> half length:
     half_total = b / 2.0
@@ -80,19 +99,19 @@ def make_bone(**params) -> cq.Workplane:
     m1213 = (( X_IN  +  X_OUT)/2.0,  ( Y_INNER +  Y_OUTER)/2.0)
 
     if EDGE_CH > 0:
-        # Top face chamfers
-        for (mx, my) in (m23, m67, m89, m1213):
-            solid = (
-                solid.faces(">Z")
-                     .edges(s.NearestToPointSelector((mx, my, THICKNESS/2)))
-                     .chamfer(EDGE_CH)
-            )
+        targets = (m23, m67, m89, m1213)
+        # Top face chamfers (all four edges in one selection / chamfer call)
+        solid = (
+            solid.faces(">Z")
+                 .edges(NearestAnyOfSelector([(mx, my, THICKNESS/2) for (mx, my) in targets]))
+                 .chamfer(EDGE_CH)
+        )
         # Bottom face chamfers
-        for (mx, my) in (m23, m67, m89, m1213):
-            solid = (
-                solid.faces("<Z")
-                     .edges(s.NearestToPointSelector((mx, my, -THICKNESS/2)))
-                     .chamfer(EDGE_CH)
-            )
+        solid = (
+            solid.faces("<Z")
+                 .edges(NearestAnyOfSelector([(mx, my, -THICKNESS/2) for (mx, my) in targets]))
+                 .chamfer(EDGE_CH)
+        )
 
+    # Re-wrap the final solid so the cached Workplane does not pin its parent chain
     return cq.Workplane(obj=solid.val())
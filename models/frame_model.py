@@ -1,5 +1,9 @@
 # models/frame_model.py
+from functools import lru_cache
+
 import cadquery as cq
+import numpy as np
+from models.selectors import NearestAnyOfSelector
 
 # ===== Public parameters (provided by UI/CLI) =====
 # make_frame(a_len, c_slot, d_nose, n)
@@ -56,6 +60,27 @@ def active_height(n: int, slot_w: float, nose_w: float) -> float:
     return n * slot_w + (n + 1) * nose_w
 
 
+def outer_size(a_len: float, c_slot: float, d_nose: float, n: int) -> tuple:
+    """Outer X/Y extent of the frame plate, derived from the parameters alone.
+
+    The cosmetic chamfers never reach the axis-aligned extremes, so this equals
+    the bounding box of make_frame(...) in X and Y (Z is always PLATE_T).
+
+    Args:
+        a_len: PCB inner width [a] in X (mm).
+        c_slot: Slot width [c] in Y (mm).
+        d_nose: Material width [d] between slots (mm).
+        n: Number of PCBs [n].
+
+    Returns:
+        (outer_x, outer_y) in mm.
+    """
+    inner_x = a_len + LEN_EXTRA
+    inner_y = active_height(n, c_slot, d_nose)
+    return inner_x + 2 * FRAME_WALL_X, inner_y + 2 * (FRAME_WALL_Y + TOP_BOTTOM_MARGIN)
+
+
+@lru_cache(maxsize=32)
 def make_frame(a_len: float, c_slot: float, d_nose: float, n: int) -> cq.Workplane:
     """Build the frame with two vertical rails and n slots per side.
 
@@ -66,11 +91,11 @@ def make_frame(a_len: float, c_slot: float, d_nose: float, n: int) -> cq.Workpla
 
     Geometry summary:
         1) Create an outer plate and cut the inner window (opening).
-        2) Add left/right vertical rails (noses) along X edges of the inner window.
-        3) Cut n slots per rail (width = c_slot, spaced by d_nose).
-        4) Cut connector rectangles near outer edges (top and bottom).
-        5) Add triangular chamfer wedges at the connector openings.
-        6) Add small cosmetic chamfers (outer corners and above connectors).
+        2) Add left/right vertical rails (noses) along X edges of the inner window,
+           each with n slots (width = c_slot, spaced by d_nose), sketched in 2D.
+        3) Cut connector rectangles near outer edges (top and bottom).
+        4) Add triangular chamfer wedges at the connector openings.
+        5) Add small cosmetic chamfers (outer corners and above connectors).
 
     Args:
         a_len: PCB inner width [a] in X (mm). The inner opening is a_len + LEN_EXTRA.
@@ -80,46 +105,42 @@ def make_frame(a_len: float, c_slot: float, d_nose: float, n: int) -> cq.Workpla
 
     Returns:
         CadQuery Workplane containing the final frame solid.
+
+    Note:
+        Results are memoized on the (positional) parameter tuple, so the
+        returned Workplane is shared between callers and must not be mutated.
     """
     # --- Inner/outer dimensions ---
     inner_x = a_len + LEN_EXTRA
     inner_y = active_height(n, c_slot, d_nose)
-    outer_x = inner_x + 2 * FRAME_WALL_X
-    outer_y = inner_y + 2 * (FRAME_WALL_Y + TOP_BOTTOM_MARGIN)
+    outer_x, outer_y = outer_size(a_len, c_slot, d_nose, n)
 
     # --- Base plate with inner window cutout ---
     frame = cq.Workplane("XY").box(outer_x, outer_y, PLATE_T)
     frame = frame.faces(">Z").workplane().rect(inner_x, inner_y).cutBlind(-PLATE_T)
 
-    # --- Left/right rails (noses) along the inner window vertical edges ---
-    left_rail = (
-        cq.Workplane("XY")
-        .center(-inner_x / 2 + NOSE_DEPTH / 2, 0)
-        .box(NOSE_DEPTH, inner_y, PLATE_T)
+    # --- Left/right rails (noses) with their slot cutouts ---
+    # The rails are drawn as one 2D sketch (rail rectangles minus slot rectangles)
+    # and extruded once, so no 3D Boolean is needed until the final merge.
+    # First nose starts at -inner_y/2 and occupies d_nose; then slot of width c_slot, etc.
+    idx = np.arange(n)
+    y_centers = -inner_y / 2 + d_nose + (idx + 0.5) * c_slot + idx * d_nose
+    rail_xs = [-inner_x / 2 + NOSE_DEPTH / 2, inner_x / 2 - NOSE_DEPTH / 2]
+    # (x, y) centers of all 2*n slots: every rail x paired with every slot y
+    slot_pts = np.column_stack([np.repeat(rail_xs, n), np.tile(y_centers, 2)])
+    rail_sketch = (
+        cq.Sketch()
+        .push([(x, 0) for x in rail_xs])
+        .rect(NOSE_DEPTH, inner_y)
+        .push([tuple(p) for p in slot_pts.tolist()])
+        .rect(NOSE_DEPTH, c_slot, mode="s")
     )
-    right_rail = (
+    rails = (
         cq.Workplane("XY")
-        .center(inner_x / 2 - NOSE_DEPTH / 2, 0)
-        .box(NOSE_DEPTH, inner_y, PLATE_T)
+        .workplane(offset=-PLATE_T / 2)
+        .placeSketch(rail_sketch)
+        .extrude(PLATE_T)
     )
-    rails = left_rail.union(right_rail)
-
-    # --- Slot cutouts inside the rails ---
-    # First nose starts at -inner_y/2 and occupies d_nose; then slot of width c_slot, etc.
-    y0 = -inner_y / 2 + d_nose
-    for i in range(n):
-        y_center = y0 + (i + 0.5) * c_slot + i * d_nose
-        cut_left = (
-            cq.Workplane("XY")
-            .center(-inner_x / 2 + NOSE_DEPTH / 2, y_center)
-            .box(NOSE_DEPTH, c_slot, PLATE_T + 0.2)
-        )
-        cut_right = (
-            cq.Workplane("XY")
-            .center(inner_x / 2 - NOSE_DEPTH / 2, y_center)
-            .box(NOSE_DEPTH, c_slot, PLATE_T + 0.2)
-        )
-        rails = rails.cut(cut_left).cut(cut_right)
 
     # Merge rails back into the frame
     frame = frame.union(rails)
@@ -153,33 +174,31 @@ def make_frame(a_len: float, c_slot: float, d_nose: float, n: int) -> cq.Workpla
         )
         return tri
 
-    wedges = None
+    # Collect all wedges and remove them in a single cut
+    wedges = []
     for (x0, y0) in centers:
-        wl = make_wedge_at_edge(x0 - CONNECTOR_W / 2, y0, -1)
-        wr = make_wedge_at_edge(x0 + CONNECTOR_W / 2, y0, 1)
-        wedges = wl if wedges is None else wedges.union(wl)
-        wedges = wedges.union(wr)
+        wedges.append(make_wedge_at_edge(x0 - CONNECTOR_W / 2, y0, -1).val())
+        wedges.append(make_wedge_at_edge(x0 + CONNECTOR_W / 2, y0, 1).val())
 
-    frame = frame.cut(wedges)
+    frame = frame.cut(cq.Compound.makeCompound(wedges))
 
     # --- Cosmetic chamfers ---
-    # Small chamfer on top Y edges around connector openings
+    # Small chamfer on top Y edges around connector openings (all 8 in one call)
     if CONNECTOR_TOP_CH > 0:
-        for (x0, y0) in centers:
-            frame = (
-                frame.edges(cq.NearestToPointSelector((x0 - CONNECTOR_W / 2, y0, PLATE_T / 2)))
-                .edges("|Y")
-                .chamfer(CONNECTOR_TOP_CH)
-            )
-            frame = (
-                frame.edges(cq.NearestToPointSelector((x0 + CONNECTOR_W / 2, y0, PLATE_T / 2)))
-                .edges("|Y")
-                .chamfer(CONNECTOR_TOP_CH)
-            )
-
-    # Outer vertical corner chamfers
+        tops = [
+            (x0 + side * CONNECTOR_W / 2, y0, PLATE_T / 2)
+            for (x0, y0) in centers
+            for side in (-1, 1)
+        ]
+        frame = (
+            frame.edges(NearestAnyOfSelector(tops))
+            .edges("|Y")
+            .chamfer(CONNECTOR_TOP_CH)
+        )
+
+    # Outer vertical corner chamfers (both X sides in one call)
     if OUTER_CORNER_CH > 0:
-        frame = frame.faces(">X").edges("|Z").chamfer(OUTER_CORNER_CH)
-        frame = frame.faces("<X").edges("|Z").chamfer(OUTER_CORNER_CH)
+        frame = frame.edges("|Z").edges(">X or <X").chamfer(OUTER_CORNER_CH)
 
+    # Re-wrap the final solid so the cached Workplane does not pin its parent chain
     return cq.Workplane(obj=frame.val())
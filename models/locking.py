@@ -0,0 +1,7 @@
+# models/locking.py
+import threading
+
+# Serializes everything that meshes shapes handed out by the memoized builders.
+# BRepMesh writes triangulations into the (shared) TShapes, so preview
+# tessellation and file export must never work on the same solid concurrently.
+MESH_LOCK = threading.Lock()
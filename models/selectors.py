@@ -0,0 +1,29 @@
+# models/selectors.py
+import numpy as np
+from cadquery.selectors import Selector
+
+
+class NearestAnyOfSelector(Selector):
+    """
+    Select, for each of several target points, the object closest to it.
+
+    Batched counterpart of cq.NearestToPointSelector: object centers are
+    computed once and matched against all targets in a single vectorized
+    distance pass, so one selection (and one chamfer call) covers all points.
+    """
+
+    def __init__(self, pnts):
+        """
+        Args:
+            pnts: Iterable of (x, y, z) target points.
+        """
+        self.pnts = np.asarray(pnts, dtype=float).reshape(-1, 3)
+
+    def filter(self, objectList):
+        if not objectList:
+            return []
+        centers = np.array([o.Center().toTuple() for o in objectList], dtype=float)
+        # (objects x targets) distance matrix -> nearest object per target
+        dist = np.linalg.norm(centers[:, None, :] - self.pnts[None, :, :], axis=-1)
+        nearest = dict.fromkeys(np.argmin(dist, axis=0).tolist())  # unique, target order
+        return [objectList[i] for i in nearest]
@@ -1,13 +1,17 @@
 # ui/main_window.py
 
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
 from PyQt6 import QtWidgets, QtCore
-import cadquery as cq
-from models.frame_model import make_frame
-from models.bone_model import make_bone
-from models.assembly import make_assembly
-from exporter.exporter import export_shape
 from ui.viewer import VTKViewer
 
+# CadQuery, the model builders and the exporter are imported lazily so the
+# window can come up while app.run_gui warms them up in the background.
+if TYPE_CHECKING:
+    import cadquery as cq
+
 
 def mklabel(text: str, tooltip: str) -> QtWidgets.QLabel:
     """Create a QLabel with tooltip."""
@@ -17,12 +21,136 @@ def mklabel(text: str, tooltip: str) -> QtWidgets.QLabel:
     return lbl
 
 
+def build_from_params(comp: str, a: float, b: float, c: float, d: float, n: int):
+    """Build the requested component from an explicit parameter tuple."""
+    from models.frame_model import make_frame
+    from models.bone_model import make_bone
+    from models.assembly import make_assembly
+
+    if comp == "frame":
+        return make_frame(a, c, d, n)
+    elif comp == "bone":
+        return make_bone(b=b)
+    else:
+        return make_assembly(a, c, d, n, b)
+
+
+def _vertices_of(shp: "cq.Workplane") -> np.ndarray:
+    """Return the (N, 3) vertex array of a part (tessellated once, see VTKViewer)."""
+    return np.asarray(VTKViewer.part_mesh(shp).points, dtype=float)
+
+
+def compute_bounding_box(model, key=None):
+    """
+    Compute an axis-aligned bounding box (X, Y, Z in mm) for either:
+    - a single CadQuery Workplane, or
+    - an assembly list of (Workplane, (dx,dy,dz), (rz,ry,rx))
+
+    If the parameter key identifies a single frame, the extents are derived
+    analytically from the parameters without touching the BRep. Otherwise
+    each part is tessellated once and its placement is applied to the vertex
+    array with NumPy (v' = v @ R.T + p) instead of transforming BRep copies.
+    """
+    from models.frame_model import outer_size, PLATE_T
+    from models.assembly import placement_matrix
+
+    if key is not None and key[0] == "frame":
+        _, a, _, c, d, n = key
+        outer_x, outer_y = outer_size(a, c, d, n)
+        return outer_x, outer_y, PLATE_T
+
+    if isinstance(model, list):
+        mins = np.full(3, np.inf)
+        maxs = np.full(3, -np.inf)
+        for shp, offset, angles in model:
+            M = placement_matrix(offset, angles)
+            verts = _vertices_of(shp) @ M[:3, :3].T + M[:3, 3]
+            mins = np.minimum(mins, verts.min(axis=0))
+            maxs = np.maximum(maxs, verts.max(axis=0))
+    else:
+        verts = _vertices_of(model)
+        mins, maxs = verts.min(axis=0), verts.max(axis=0)
+
+    # Return lengths (positive extents)
+    x, y, z = (maxs - mins).tolist()
+    return x, y, z
+
+
+class BuildSignals(QtCore.QObject):
+    """Signals of BuildWorker (a QRunnable cannot declare signals itself)."""
+    done = QtCore.pyqtSignal(int, object, object, object, object)  # gen, key, model, scene, size
+    failed = QtCore.pyqtSignal(int, str)  # gen, error message
+
+
+class BuildWorker(QtCore.QRunnable):
+    """
+    Build a model, its preview parts and its size on a QThreadPool thread.
+
+    Every job carries the generation number it was scheduled with; the
+    window only accepts results of the newest generation, and jobs that
+    are already stale when they start are skipped entirely.
+    """
+
+    def __init__(self, gen: int, key: tuple, is_current, models_ready=None):
+        super().__init__()
+        self.gen = gen
+        self.key = key
+        self._is_current = is_current
+        self._models_ready = models_ready
+        self.signals = BuildSignals()
+
+    def run(self):
+        # Wait for the background CadQuery warm-up (if any) before building
+        if self._models_ready is not None:
+            self._models_ready.wait()
+        if not self._is_current(self.gen):
+            return
+        try:
+            model = build_from_params(*self.key)
+            scene = VTKViewer.build_scene(model)
+        except Exception as e:
+            self.signals.failed.emit(self.gen, str(e))
+            return
+        try:
+            size = compute_bounding_box(model, self.key)
+        except Exception:
+            size = None  # the size readout is informational only
+        self.signals.done.emit(self.gen, self.key, model, scene, size)
+
+
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    def __init__(self, models_ready=None):
+        """
+        Args:
+            models_ready: Optional threading.Event set once CadQuery and the
+                model modules are imported; builds wait for it.
+        """
         super().__init__()
+        self._models_ready = models_ready
         self.setWindowTitle("PCB Magazine Generator")
         self.resize(1300, 900)
 
+        # Last built model and the parameter tuple it was built from
+        self._last_key = None
+        self._last_model = None
+
+        # Generation counter of background preview builds; only the newest is shown
+        self._gen = 0
+        # Dedicated single-thread pool: at most one build runs at a time, and
+        # queued jobs that went stale meanwhile are skipped when they start
+        self._build_pool = QtCore.QThreadPool(self)
+        self._build_pool.setMaxThreadCount(1)
+        # Component currently on screen; the camera is re-fitted when it changes
+        self._shown_comp = None
+        # (key, scene) of the preview on screen, reused for STL export
+        self._last_scene = None
+
+        # Debounce parameter edits: rebuild once the user pauses for 150 ms
+        self._rebuild_timer = QtCore.QTimer(self)
+        self._rebuild_timer.setSingleShot(True)
+        self._rebuild_timer.setInterval(150)
+        self._rebuild_timer.timeout.connect(self.update_preview)
+
         splitter = QtWidgets.QSplitter()
         splitter.setOrientation(QtCore.Qt.Orientation.Horizontal)
         self.setCentralWidget(splitter)
@@ -50,7 +178,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.a_spin.setRange(10, 10000)
         self.a_spin.setValue(90.0)
         self.a_spin.setSuffix(" mm")
-        self.a_spin.valueChanged.connect(self.update_preview)
+        self.a_spin.valueChanged.connect(self._schedule_preview)
         self.a_spin.setToolTip(
             "<b>PCB-width [a]</b><br>"
             "Inner dimension in X direction (PCB length).<br>"
@@ -62,7 +190,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.b_spin.setRange(1, 1000)
         self.b_spin.setValue(120)
         self.b_spin.setSuffix(" mm")
-        self.b_spin.valueChanged.connect(self.update_preview)
+        self.b_spin.valueChanged.connect(self._schedule_preview)
         self.b_spin.setToolTip(
             "<b>PCB-height [b]</b><br>"
             "Total bone length including dovetail tips.<br>"
@@ -76,7 +204,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.c_spin.setDecimals(3)
         self.c_spin.setValue(1.6)
         self.c_spin.setSuffix(" mm")
-        self.c_spin.valueChanged.connect(self.update_preview)
+        self.c_spin.valueChanged.connect(self._schedule_preview)
         self.c_spin.setToolTip(
             "<b>PCB-thickness [c]</b><br>"
             "Width of each slot = PCB thickness.<br>"
@@ -88,7 +216,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.d_spin.setRange(0.1, 100)
         self.d_spin.setValue(10.0)
         self.d_spin.setSuffix(" mm")
-        self.d_spin.valueChanged.connect(self.update_preview)
+        self.d_spin.valueChanged.connect(self._schedule_preview)
         self.d_spin.setToolTip(
             "<b>PCB-PCB-distance [d]</b><br>"
             "Material width between two slots."
@@ -98,7 +226,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.n_spin = QtWidgets.QSpinBox()
         self.n_spin.setRange(1, 200)
         self.n_spin.setValue(10)
-        self.n_spin.valueChanged.connect(self.update_preview)
+        self.n_spin.valueChanged.connect(self._schedule_preview)
         self.n_spin.setToolTip(
             "<b>PCB-count [n]</b><br>"
             "Number of PCBs (and therefore number of slots)."
@@ -141,72 +269,96 @@ class MainWindow(QtWidgets.QMainWindow):
 
         # Default start view: assembly
         self.component_combo.setCurrentText("assembly")
+        # setCurrentText armed the debounce via on_component_changed; build once, now
+        self._rebuild_timer.stop()
         self.update_preview()
 
-    def build_model(self):
-        """Builds the selected model with current parameters."""
-        comp = self.component_combo.currentText()
-        if comp == "frame":
-            return make_frame(self.a_spin.value(), self.c_spin.value(), self.d_spin.value(), self.n_spin.value())
-        elif comp == "bone":
-            return make_bone(b=self.b_spin.value())
-        else:
-            return make_assembly(
-                self.a_spin.value(),
-                self.c_spin.value(),
-                self.d_spin.value(),
-                self.n_spin.value(),
-                self.b_spin.value()
-            )
+    def _current_key(self) -> tuple:
+        """Return the current (component, a, b, c, d, n) parameter tuple."""
+        def val(spin): return round(spin.value(), spin.decimals())
+        return (
+            self.component_combo.currentText(),
+            val(self.a_spin),
+            val(self.b_spin),
+            val(self.c_spin),
+            val(self.d_spin),
+            self.n_spin.value(),
+        )
 
-    def _compute_bounding_box(self, model):
+    def build_model(self):
         """
-        Compute an axis-aligned bounding box (X, Y, Z in mm) for either:
-        - a single CadQuery Workplane, or
-        - an assembly list of (Workplane, (dx,dy,dz), (rz,ry,rx))
+        Builds the selected model with current parameters.
+
+        The last built model is memoized on the window so preview, size readout
+        and export share one shape as long as the parameters are unchanged.
+
+        Returns:
+            (key, model) where key is the (comp, a, b, c, d, n) parameter tuple.
         """
-        def apply_transform(wp, dx, dy, dz, rz, ry, rx):
-            if rz: wp = wp.rotate((0, 0, 0), (0, 0, 1), rz)
-            if ry: wp = wp.rotate((0, 0, 0), (0, 1, 0), ry)
-            if rx: wp = wp.rotate((0, 0, 0), (1, 0, 0), rx)
-            return wp.translate((dx, dy, dz))
-
-        if isinstance(model, list):
-            solids = []
-            for shp, (dx, dy, dz), (rz, ry, rx) in model:
-                moved = apply_transform(shp, dx, dy, dz, rz, ry, rx)
-                solids.append(moved.val())
-            comp = cq.Compound.makeCompound(solids)
-            bb = comp.BoundingBox()
-        else:
-            bb = cq.Compound.makeCompound([model.val()]).BoundingBox()
-
-        # Return lengths (positive extents)
-        return bb.xlen, bb.ylen, bb.zlen
-
-    def _update_size_label(self, model):
-        """Update the size label with the model's bounding box in mm."""
-        try:
-            x, y, z = self._compute_bounding_box(model)
-            # Round to 2 decimals for readability
-            def fmt(v): return f"{v:.2f}"
-            self.size_value.setText(f"{fmt(x)} × {fmt(y)} × {fmt(z)} mm")
-        except Exception:
+        key = self._current_key()
+        if key != self._last_key:
+            if self._models_ready is not None:
+                self._models_ready.wait()
+            self._last_model = build_from_params(*key)
+            self._last_key = key
+        return key, self._last_model
+
+    def _update_size_label(self, size):
+        """Update the size label with a bounding box (X, Y, Z) in mm, or None."""
+        if size is None:
             self.size_value.setText("— × — × — mm")
+            return
+        x, y, z = size
+        # Round to 2 decimals for readability
+        def fmt(v): return f"{v:.2f}"
+        self.size_value.setText(f"{fmt(x)} × {fmt(y)} × {fmt(z)} mm")
+
+    def _schedule_preview(self, *_):
+        """(Re)start the debounce timer; signal arguments are ignored on purpose
+        so QTimer.start(msec) never receives a spinbox value as its interval."""
+        self._rebuild_timer.start()
 
     def update_preview(self):
-        """Rebuilds and displays the model preview, then updates the size readout."""
-        try:
-            model = self.build_model()
-            self.viewer.show(model)
-            self._update_size_label(model)
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Model build error", str(e))
+        """Schedules a background rebuild of the model preview and size readout."""
+        self._gen += 1
+        worker = BuildWorker(
+            self._gen, self._current_key(), lambda gen: gen == self._gen, self._models_ready
+        )
+        worker.signals.done.connect(self._on_build_done)
+        worker.signals.failed.connect(self._on_build_failed)
+        self._build_pool.start(worker)
+
+    def _on_build_done(self, gen: int, key: tuple, model, scene, size):
+        """Displays a finished background build unless a newer one was scheduled."""
+        if gen != self._gen:
+            return
+        self._last_key = key
+        self._last_model = model
+        self._last_scene = (key, scene)
+        self.viewer.show_scene(scene, reset_camera=key[0] != self._shown_comp)
+        self._shown_comp = key[0]
+        self._update_size_label(size)
+
+    def _on_build_failed(self, gen: int, message: str):
+        """Reports a failed background build unless a newer one was scheduled."""
+        if gen != self._gen:
+            return
+        QtWidgets.QMessageBox.critical(self, "Model build error", message)
 
     def export_model(self):
-        """Exports the current model to STEP or STL."""
+        """
+        Exports the current model to STEP or STL.
+
+        The memoized model is reused when it matches the current parameters; an
+        STL export of an up-to-date preview just saves the preview mesh.
+
+        A preview build still in flight is waited for first (blocking the GUI
+        briefly), so the export picks up its result from the builders' caches
+        instead of building the same key a second time on the GUI thread.
+        """
         try:
-            model = self.build_model()
+            self._build_pool.waitForDone()
+            key, model = self.build_model()
             fmt = self.fmt_combo.currentText()
             default_name = "model.step" if fmt == "step" else "model.stl"
             out, _ = QtWidgets.QFileDialog.getSaveFileName(
@@ -216,19 +368,22 @@ class MainWindow(QtWidgets.QMainWindow):
             if not out:
                 return
 
-            if isinstance(model, list):
+            from exporter.exporter import export_shape
+            from models.assembly import combine_placements
+
+            if (
+                fmt == "stl"
+                and out.lower().endswith(".stl")
+                and self._last_scene is not None
+                and self._last_scene[0] == key
+            ):
+                # Preview is current: write its (planar-exact) mesh as binary STL
+                mesh = VTKViewer.merge_scene(self._last_scene[1])
+                mesh.save(out)
+                path = str(Path(out).resolve())
+            elif isinstance(model, list):
                 # Export assembly as compound
-                moved_vals = []
-                for shp, (dx, dy, dz), (rz, ry, rx) in model:
-                    wp = shp
-                    if rz: wp = wp.rotate((0, 0, 0), (0, 0, 1), rz)
-                    if ry: wp = wp.rotate((0, 0, 0), (0, 1, 0), ry)
-                    if rx: wp = wp.rotate((0, 0, 0), (1, 0, 0), rx)
-                    wp = wp.translate((dx, dy, dz))
-                    moved_vals.append(wp.val())
-                comp = cq.Compound.makeCompound(moved_vals)
-                wp_comp = cq.Workplane(obj=comp)
-                path = export_shape(wp_comp, out, fmt)
+                path = export_shape(combine_placements(model), out, fmt)
             else:
                 path = export_shape(model, out, fmt)
 
@@ -246,5 +401,5 @@ class MainWindow(QtWidgets.QMainWindow):
             w.setEnabled(is_frame or is_assembly)
         self.b_spin.setEnabled(is_bone or is_assembly)
 
-        # Auto-update preview on view change
-        self.update_preview()
+        # Auto-update preview on view change (debounced like parameter edits)
+        self._schedule_preview()
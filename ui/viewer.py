@@ -1,22 +1,41 @@
 # ui/viewer.py
-import os
-import tempfile
-import cadquery as cq
+import weakref
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pyvista as pv
 from pyvistaqt import QtInteractor
 from PyQt6 import QtWidgets
+from models.locking import MESH_LOCK
+
+if TYPE_CHECKING:  # CadQuery is imported lazily (see app.run_gui)
+    import cadquery as cq
+
+# Preview meshing parameters for BRepMesh_IncrementalMesh: a coarse deflection
+# relative to the edge sizes instead of the fabrication tolerance used on export.
+PREVIEW_LIN_DEFLECTION = 0.3
+PREVIEW_ANG_DEFLECTION = 0.5
+
+# Prepared preview geometry (surface with normals, feature edges) per raw part.
+# The model builders are memoized, so unchanged parts hit this cache across rebuilds.
+# Filled (and the shared solids meshed) only while holding MESH_LOCK.
+_part_cache = weakref.WeakKeyDictionary()
 
 
 class VTKViewer(QtWidgets.QFrame):
     """
-    Lightweight STL-based 3D preview using PyVistaQt.
+    Lightweight mesh-based 3D preview using PyVistaQt.
 
     Notes:
-        - We always export a temporary STL for preview (fast and portable).
-        - For assemblies, parts are transformed (rotate+translate) and combined
-          into a single compound prior to export.
-        - The visual style uses a smooth shaded surface with a thin wireframe
-          overlay for legible edges without triangle clutter.
+        - Shapes are tessellated in memory straight into a PolyData (no STL
+          round-trip through the file system).
+        - Each distinct part is tessellated once (memoized per part; OCCT's
+          mesher itself runs in parallel) and rendered by one actor per
+          placement; the placement (rotate+translate) is the actor's user
+          matrix, so the four bones share a single mesh.
+        - The visual style uses a smooth shaded surface with a thin overlay of
+          the model's feature edges (face boundaries and creases) for legible
+          edges without triangle clutter.
     """
 
     def __init__(self, parent=None):
@@ -29,72 +48,187 @@ class VTKViewer(QtWidgets.QFrame):
     def _reset_view(self) -> None:
         """Initialize/clear the scene and reset the camera."""
         self.plotter.clear()
+        # Persistent (surface, edge) actor pairs, one per displayed placement
+        self._actors = []
         self.plotter.add_axes()
         self.plotter.show_grid()
         self.plotter.reset_camera()
 
-    def _export_to_stl(self, shape: cq.Workplane, path: str) -> None:
-        """Export a CadQuery Workplane to an STL file at the given path."""
-        cq.exporters.export(shape, path, exportType="STL")
+    @staticmethod
+    def _polydata(pts: np.ndarray, tris: np.ndarray) -> pv.PolyData:
+        """Build a triangle PolyData from (N, 3) points and (M, 3) vertex indices."""
+        pts = np.asarray(pts, dtype=np.float32).reshape(-1, 3)
+        tris = np.asarray(tris, dtype=np.int64).reshape(-1, 3)
+        faces = np.column_stack([np.full(len(tris), 3, dtype=np.int64), tris]).ravel()
+        return pv.PolyData(pts, faces)
 
-    def _combine_assembly(self, items):
+    @classmethod
+    def tessellate(cls, shape: "cq.Workplane") -> pv.PolyData:
         """
-        Combine an assembly into a single compound Workplane.
+        Tessellate a CadQuery Workplane in memory into a triangle PolyData.
 
-        Args:
-            items: list of tuples
-                (workplane, (dx, dy, dz), (rz, ry, rx))
-                where rotations are in degrees.
+        The shape is meshed once with OCCT's (parallel) incremental mesher at
+        the preview deflection, and the per-face triangulations are read back
+        directly via BRep_Tool.Triangulation. Meshing writes into the shape,
+        so call it through _parts() (which holds MESH_LOCK) for shared solids.
+        """
+        from OCP.BRep import BRep_Tool
+        from OCP.BRepMesh import BRepMesh_IncrementalMesh
+        from OCP.TopAbs import TopAbs_Orientation
+        from OCP.TopLoc import TopLoc_Location
 
-        Returns:
-            cq.Workplane: compound of all transformed parts.
+        val = shape.val()
+        BRepMesh_IncrementalMesh(
+            val.wrapped, PREVIEW_LIN_DEFLECTION, True, PREVIEW_ANG_DEFLECTION, True
+        )
+
+        pts, tris, offset = [], [], 0
+        for face in val.Faces():
+            loc = TopLoc_Location()
+            poly = BRep_Tool.Triangulation_s(face.wrapped, loc)
+            if poly is None:
+                continue
+            trsf = loc.Transformation()
+            for i in range(1, poly.NbNodes() + 1):
+                p = poly.Node(i).Transformed(trsf)
+                pts.append((p.X(), p.Y(), p.Z()))
+            # Keep outward-facing winding on reversed faces
+            reversed_ = face.wrapped.Orientation() == TopAbs_Orientation.TopAbs_REVERSED
+            order = (1, 3, 2) if reversed_ else (1, 2, 3)
+            for i in range(1, poly.NbTriangles() + 1):
+                t = poly.Triangle(i)
+                tris.append(tuple(t.Value(j) - 1 + offset for j in order))
+            offset += poly.NbNodes()
+        return cls._polydata(pts, tris)
+
+    @classmethod
+    def _prepare_part(cls, shape: "cq.Workplane") -> tuple:
+        """Tessellate a part and derive its display data: (surface, edges)."""
+        mesh = cls.tessellate(shape)
+        # Point normals for smooth shading (add_mesh would compute them only once)
+        surf = mesh.compute_normals(cell_normals=False)
+        # Only the CAD-visible edges, not every triangle edge
+        edges = mesh.extract_feature_edges(
+            feature_angle=30,
+            boundary_edges=True,
+            non_manifold_edges=False,
+            manifold_edges=False,
+        )
+        return surf, edges
+
+    @classmethod
+    def _parts(cls, shapes) -> list:
         """
-        moved_vals = []
-        for shp, (dx, dy, dz), (rz, ry, rx) in items:
-            wp = shp
-            if rz:
-                wp = wp.rotate((0, 0, 0), (0, 0, 1), rz)
-            if ry:
-                wp = wp.rotate((0, 0, 0), (0, 1, 0), ry)
-            if rx:
-                wp = wp.rotate((0, 0, 0), (1, 0, 0), rx)
-            wp = wp.translate((dx, dy, dz))
-            moved_vals.append(wp.val())
-        comp = cq.Compound.makeCompound(moved_vals)
-        return cq.Workplane(obj=comp)
-
-    def show(self, obj) -> None:
+        Return the prepared (surface, edges) of each shape, memoized per part.
+
+        The builders hand out the same solids to every caller, so missing parts
+        are meshed under MESH_LOCK (check, lock, check again); this keeps a
+        worker build and an export from triangulating one solid at once.
         """
-        Render a single Workplane or an assembly list.
+        if any(s not in _part_cache for s in shapes):
+            with MESH_LOCK:
+                for shp in {id(s): s for s in shapes if s not in _part_cache}.values():
+                    _part_cache[shp] = cls._prepare_part(shp)
+                return [_part_cache[s] for s in shapes]
+        return [_part_cache[s] for s in shapes]
+
+    @classmethod
+    def part_mesh(cls, shape: "cq.Workplane") -> pv.PolyData:
+        """Memoized surface mesh of a single (untransformed) part."""
+        return cls._parts([shape])[0][0]
+
+    @classmethod
+    def build_scene(cls, obj) -> list:
+        """
+        Tessellate a single Workplane or an assembly list into preview parts.
+
+        Does not touch the plotter, so it is safe to call from a worker thread.
 
         Args:
             obj: cq.Workplane or list as returned by make_assembly(...)
+
+        Returns:
+            list of (surface, edges, matrix) with one entry per placement, where
+            matrix is the 4x4 placement transform and meshes may be shared.
         """
-        with tempfile.TemporaryDirectory() as td:
-            tmp = os.path.join(td, "preview.stl")
-            if isinstance(obj, list):
-                comp = self._combine_assembly(obj)
-                self._export_to_stl(comp, tmp)
+        from models.assembly import placement_matrix
+
+        items = obj if isinstance(obj, list) else [(obj, (0, 0, 0), (0, 0, 0))]
+        prepared = cls._parts([shp for shp, _, _ in items])
+        return [
+            (surf, edges, placement_matrix(xyz, angles))
+            for (surf, edges), (_, xyz, angles) in zip(prepared, items)
+        ]
+
+    @classmethod
+    def merge_scene(cls, scene: list) -> pv.PolyData:
+        """
+        Flatten preview parts from build_scene(...) into one world-space mesh.
+
+        Each placement matrix is applied to its part's vertices and the
+        triangle indices are offset, so the result can be saved directly
+        (e.g. mesh.save("model.stl")) without re-tessellating.
+        """
+        all_pts, all_tris, offset = [], [], 0
+        for surf, _, matrix in scene:
+            pts = np.asarray(surf.points, dtype=float)
+            all_pts.append(pts @ matrix[:3, :3].T + matrix[:3, 3])
+            all_tris.append(surf.faces.reshape(-1, 4)[:, 1:] + offset)
+            offset += surf.n_points
+        return cls._polydata(np.concatenate(all_pts), np.concatenate(all_tris))
+
+    def show_scene(self, scene: list, reset_camera: bool = False) -> None:
+        """
+        Display preview parts produced by build_scene(...).
+
+        Actor pairs are kept between updates and only get their input data and
+        user matrix swapped, so the VTK pipeline is not rebuilt and the camera
+        is kept unless reset_camera is requested (always on first show).
+        """
+        if not self._actors:
+            reset_camera = True
+
+        for i, (surf, edges, matrix) in enumerate(scene):
+            if i < len(self._actors):
+                surf_actor, edge_actor = self._actors[i]
+                surf_actor.mapper.SetInputData(surf)
+                edge_actor.mapper.SetInputData(edges)
             else:
-                self._export_to_stl(obj, tmp)
-
-            mesh = pv.read(tmp)
-            self.plotter.clear()
-
-            # Smooth shaded surface (no triangle edges)
-            self.plotter.add_mesh(
-                mesh,
-                show_edges=False,
-                smooth_shading=True,
-                color="lightgray",
-            )
-
-            # Thin wireframe overlay for visual edges
-            self.plotter.add_mesh(
-                mesh,
-                style="wireframe",
-                color="black",
-                line_width=1,
-            )
+                # Smooth shaded surface (no triangle edges)
+                surf_actor = self.plotter.add_mesh(
+                    surf,
+                    show_edges=False,
+                    smooth_shading=True,
+                    color="lightgray",
+                    reset_camera=False,
+                )
+                # Thin feature-edge overlay for visual edges
+                edge_actor = self.plotter.add_mesh(
+                    edges,
+                    color="black",
+                    line_width=1,
+                    reset_camera=False,
+                )
+                self._actors.append((surf_actor, edge_actor))
+            surf_actor.user_matrix = matrix
+            edge_actor.user_matrix = matrix
+
+        # Drop actors of placements that are no longer shown
+        for surf_actor, edge_actor in self._actors[len(scene):]:
+            self.plotter.remove_actor(surf_actor, render=False)
+            self.plotter.remove_actor(edge_actor, render=False)
+        del self._actors[len(scene):]
 
+        if reset_camera:
             self.plotter.reset_camera()
+        self.plotter.render()
+
+    def show(self, obj, reset_camera: bool = False) -> None:
+        """
+        Render a single Workplane or an assembly list.
+
+        Args:
+            obj: cq.Workplane or list as returned by make_assembly(...)
+            reset_camera: Re-fit the camera to the new geometry.
+        """
+        self.show_scene(self.build_scene(obj), reset_camera)